@@ -9,7 +9,7 @@ from .consts import ITCH_API
 
 
 class ItchApiClient:
-    def __init__(self, api_key: str, user_agent: str, base_url: Optional[str] = None) -> None:
+    def __init__(self, api_key: str, user_agent: str, base_url: Optional[str] = None, pool_size: int = 1) -> None:
         self.base_url = base_url or ITCH_API
         self.api_key = api_key
 
@@ -23,8 +23,12 @@ class ItchApiClient:
             status_forcelist=[429, 500, 502, 503, 504],
         )
 
+        # Size the pool to the download parallelism (keeping the urllib3 default
+        # as the floor), otherwise threads discard and reopen connections.
+        pool_size = max(pool_size, 10)
+
         # No timeouts - set them explicitly on API calls below!
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_size, pool_maxsize=pool_size)
         self.requests.mount("https://", adapter)
         self.requests.mount("http://", adapter)
 
@@ -3,10 +3,10 @@ import sys
 import logging
 import argparse
 
-from .handlers import get_jobs_for_url_or_path
-from .downloader import drive_downloads
+from .handlers import get_jobs_for_url_or_path, canonicalize_job_url
+from .downloader import drive_downloads, PER_GAME_DOWNLOAD_WORKERS
 from .config import Settings, load_config
-from .keys import get_download_keys
+from .keys import get_download_keys, KEY_CACHE
 from .api import ItchApiClient
 
 logging.basicConfig()
@@ -39,6 +39,8 @@ def parse_args() -> argparse.Namespace:
                         help="filter downloaded files with a shell-style glob/fnmatch (unmatched files are skipped)")
     parser.add_argument("--filter-files-regex", metavar="regex", default=None,
                         help="filter downloaded files with a Python regex (unmatched files are skipped)")
+    parser.add_argument("--refresh-keys", action="store_true",
+                        help="refetch the download keys instead of using the cached ones")
     parser.add_argument("--verbose", action="store_true",
                         help="print verbose logs")
 
@@ -64,8 +66,15 @@ def run() -> int:
     url_or_path = args.url_or_path
     del args  # Do not use `args` beyond this point.
 
+    # Applies to both --my-purchases jobs and download key lookups:
+    KEY_CACHE.refresh_from_api = settings.refresh_keys
+
     # Check API key validity:
-    client = ItchApiClient(settings.api_key, settings.user_agent)
+    client = ItchApiClient(
+        settings.api_key,
+        settings.user_agent,
+        pool_size=settings.parallel * PER_GAME_DOWNLOAD_WORKERS,
+    )
     profile_req = client.get("/profile")
     if not profile_req.ok:
         sys.exit(
@@ -73,8 +82,8 @@ def run() -> int:
             "See https://github.com/DragoonAethis/itch-dl/wiki/API-Keys for more info."
         )
 
-    jobs = get_jobs_for_url_or_path(url_or_path, settings)
-    jobs = list(set(jobs))  # Deduplicate, just in case...
+    jobs = get_jobs_for_url_or_path(url_or_path, settings, client=client)
+    jobs = list({canonicalize_job_url(job) for job in jobs})  # Deduplicate, just in case...
     logging.info("Found %d URL(s).", len(jobs))
 
     if len(jobs) == 0:
@@ -93,5 +102,5 @@ def run() -> int:
     # Grab all the download keys (there's no way to fetch them per title...):
     keys = get_download_keys(client)
 
-    drive_downloads(jobs, settings, keys)
+    drive_downloads(jobs, settings, keys, client=client)
     return 0
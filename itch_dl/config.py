@@ -1,15 +1,18 @@
 import os
 import json
 import logging
+import functools
 import platform
 import argparse
-from typing import Optional
+from dataclasses import dataclass, fields
+from typing import Any, Optional, Union, get_args, get_origin, get_type_hints
 
 import requests
-from pydantic import BaseModel
 
 from . import __version__
 
+DEFAULT_USER_AGENT = f"python-requests/{requests.__version__} itch-dl/{__version__}"
+
 OVERRIDABLE_SETTINGS = (
     "api_key",
     "user_agent",
@@ -19,16 +22,18 @@ OVERRIDABLE_SETTINGS = (
     "parallel",
     "filter_files_glob",
     "filter_files_regex",
+    "refresh_keys",
     "verbose",
 )
 
 
-class Settings(BaseModel):
+@dataclass
+class Settings:
     """Available settings for itch-dl. Make sure all of them
     have default values, as the config file may not exist."""
 
     api_key: Optional[str] = None
-    user_agent: str = f"python-requests/{requests.__version__} itch-dl/{__version__}"
+    user_agent: str = DEFAULT_USER_AGENT
 
     download_to: Optional[str] = None
     mirror_web: bool = False
@@ -38,9 +43,68 @@ class Settings(BaseModel):
     filter_files_glob: Optional[str] = None
     filter_files_regex: Optional[str] = None
 
+    refresh_keys: bool = False
     verbose: bool = False
 
 
+SETTINGS_FIELD_NAMES = {f.name for f in fields(Settings)}
+SETTINGS_FIELD_TYPES = get_type_hints(Settings)
+
+# Config files are hand-written JSON - accept the usual boolean spellings:
+BOOLEAN_STRINGS = {
+    "true": True,
+    "yes": True,
+    "on": True,
+    "1": True,
+    "false": False,
+    "no": False,
+    "off": False,
+    "0": False,
+}
+
+
+def coerce_setting_value(key: str, value: Any, expected_type: Any) -> Any:  # noqa: ANN401
+    """Converts a config value to its Settings field type the way pydantic
+    used to ("4" -> 4, "false" -> False), or raises ValueError."""
+    if get_origin(expected_type) is Union:  # Optional[X] is Union[X, None]
+        if value is None:
+            return None
+        expected_type = next(a for a in get_args(expected_type) if a is not type(None))
+
+    # (bools are ints - don't let True slip through as an int value as-is)
+    if isinstance(value, expected_type) and not (expected_type is int and isinstance(value, bool)):
+        return value
+
+    if expected_type is bool:
+        if isinstance(value, str) and value.strip().lower() in BOOLEAN_STRINGS:
+            return BOOLEAN_STRINGS[value.strip().lower()]
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+    elif expected_type is int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            pass
+    elif expected_type is str and isinstance(value, (int, float)):
+        return str(value)
+
+    raise ValueError(f"Config setting '{key}' should be of type {expected_type.__name__}, found: {value!r}")
+
+
+def clean_config(config_data: dict) -> dict:
+    """Removes keys the Settings dataclass would not accept and coerces
+    the values to the field types (pydantic used to do both silently)."""
+    cleaned_config = {}
+    for key, value in config_data.items():
+        if key in SETTINGS_FIELD_NAMES:
+            cleaned_config[key] = coerce_setting_value(key, value, SETTINGS_FIELD_TYPES[key])
+        else:
+            logging.warning("Unknown setting found in the config, ignoring: %s", key)
+
+    return cleaned_config
+
+
+@functools.lru_cache(maxsize=1)
 def create_and_get_config_path() -> str:
     """Returns the configuration directory in the appropriate
     location for the current OS. The directory may not exist."""
@@ -57,6 +121,23 @@ def create_and_get_config_path() -> str:
     return os.path.join(base_path, "itch-dl")
 
 
+@functools.lru_cache(maxsize=1)
+def create_and_get_cache_path() -> str:
+    """Returns the cache directory in the appropriate location
+    for the current OS. The directory may not exist."""
+    system = platform.system()
+    if system == "Linux":
+        base_path = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache/")
+    elif system == "Darwin":
+        base_path = os.path.expanduser("~/Library/Caches/")
+    elif system == "Windows":
+        base_path = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/AppData/Local/")
+    else:
+        raise NotImplementedError(f"Unknown platform: {system}")
+
+    return os.path.join(base_path, "itch-dl")
+
+
 def load_config(args: argparse.Namespace, profile: Optional[str] = None) -> Settings:
     """Loads the configuration from the file system if it exists,
     the returns a Settings object."""
@@ -73,13 +154,13 @@ def load_config(args: argparse.Namespace, profile: Optional[str] = None) -> Sett
 
     if os.path.isfile(profile_file_path):
         logging.debug("Found profile: %s", profile_file_path)
-        with open(config_file_path) as f:
+        with open(profile_file_path) as f:
             profile_data = json.load(f)
 
         config_data.update(profile_data)
 
     # All settings from the base file:
-    settings = Settings(**config_data)
+    settings = Settings(**clean_config(config_data))
 
     # Apply overrides from CLI args:
     for key in OVERRIDABLE_SETTINGS:
@@ -3,12 +3,15 @@ import json
 import re
 import fnmatch
 import logging
+import contextlib
 import urllib.parse
 import zipfile
 import tarfile
-from typing import List, Dict, TypedDict, Optional, Union, Any
+from email.utils import formatdate
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, TypedDict, Optional, Union
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from requests.exceptions import HTTPError, JSONDecodeError
 
 from tqdm import tqdm
@@ -20,6 +23,20 @@ from .consts import ITCH_GAME_URL_REGEX
 from .config import Settings
 from .infobox import parse_infobox, InfoboxMetadata
 
+# Larger chunks mean fewer Python-level loop iterations and
+# syscalls per downloaded byte - measurable on fast links.
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# How many uploads of a single game to transfer at once:
+PER_GAME_DOWNLOAD_WORKERS = 3
+
+# All the tags metadata extraction cares about - parsing just these (and
+# their subtrees) skips building Python wrappers for most of the page.
+SITE_PARSE_STRAINER = SoupStrainer(["meta", "script", "h1", "div"])
+
+# Upload metadata keys we cannot download without:
+UPLOAD_REQUIRED_KEYS = frozenset({"id", "filename", "storage"})
+
 TARGET_PATHS = {
     "site": "site.html",
     "cover": "cover",
@@ -62,16 +79,50 @@ class GameMetadata(TypedDict, total=False):
 
 
 class GameDownloader:
-    def __init__(self, settings: Settings, keys: Dict[int, str]) -> None:
+    def __init__(self, settings: Settings, keys: Dict[int, str], client: Optional[ItchApiClient] = None) -> None:
         self.settings = settings
         self.download_keys = keys
-        self.client = ItchApiClient(settings.api_key, settings.user_agent)
+        self.client = client or ItchApiClient(
+            settings.api_key,
+            settings.user_agent,
+            pool_size=settings.parallel * PER_GAME_DOWNLOAD_WORKERS,
+        )
+
+        # URL -> game ID, to avoid re-deriving (sometimes via an extra
+        # network round-trip) when the same URL is retried in-process:
+        self.game_id_cache: Dict[str, int] = {}
+
+        # File filters run against every upload of every game - compile them once.
+        # (A broken pattern fails the whole run here, before anything downloads.)
+        self.filter_files_suffix: Optional[str] = None
+        self.filter_files_glob: Optional[re.Pattern[str]] = None
+        if settings.filter_files_glob:
+            # fnmatch.fnmatch normcases both sides (case-insensitive on Windows),
+            # so normcase the pattern here and the filenames on every check:
+            glob = os.path.normcase(settings.filter_files_glob)
+            if glob.startswith("*") and not any(c in "*?[" for c in glob[1:]):
+                # Most filters look like "*.zip" - that's a plain suffix check,
+                # no need to run the translated regex per filename:
+                self.filter_files_suffix = glob[1:]
+            else:
+                self.filter_files_glob = re.compile(fnmatch.translate(glob))
+        self.filter_files_regex = re.compile(settings.filter_files_regex) if settings.filter_files_regex else None
 
     @staticmethod
-    def get_rating_json(site: BeautifulSoup) -> Optional[dict]:
-        for ldjson_node in site.find_all("script", type="application/ld+json"):
+    def get_script_tags(site: BeautifulSoup) -> Dict[str, List[BeautifulSoup]]:
+        """Buckets all the <script> tags by their type attribute in one
+        DOM pass, as multiple extractors below want different kinds."""
+        script_tags: Dict[str, List[BeautifulSoup]] = {}
+        for node in site.find_all("script"):
+            script_tags.setdefault(node.get("type"), []).append(node)
+
+        return script_tags
+
+    @staticmethod
+    def get_rating_json(scripts: List[BeautifulSoup]) -> Optional[dict]:
+        for ldjson_node in scripts:
             try:
-                ldjson: dict = json.loads(ldjson_node.text.strip())
+                ldjson: dict = json.loads(ldjson_node.text)  # (whitespace is fine for the parser)
                 if ldjson.get("@type") == "Product":
                     return ldjson
             except json.JSONDecodeError:
@@ -80,20 +131,25 @@ class GameDownloader:
         return None
 
     @staticmethod
-    def get_meta(site: BeautifulSoup, **kwargs: Any) -> Optional[str]:  # noqa: ANN401
-        """Grabs <meta property="xyz" content="value"/> values."""
-        node = site.find("meta", attrs=kwargs)
-        if not node:
-            return None
-
-        return node.get("content")
-
-    def get_game_id(self, url: str, site: BeautifulSoup) -> int:
-        game_id: Optional[int] = None
+    def get_meta_tags(site: BeautifulSoup) -> Dict[str, str]:
+        """Grabs all the <meta property/name="xyz" content="value"/> values
+        in one DOM pass. On duplicates, the first tag wins (like site.find)."""
+        meta_tags: Dict[str, str] = {}
+        for node in site.find_all("meta"):
+            key, content = node.get("property") or node.get("name"), node.get("content")
+            if key and content is not None:
+                meta_tags.setdefault(key, content)
+
+        return meta_tags
+
+    def get_game_id(self, url: str, meta_tags: Dict[str, str], scripts: List[BeautifulSoup]) -> int:
+        game_id: Optional[int] = self.game_id_cache.get(url)
+        if game_id is not None:
+            return game_id
 
         try:
             # Headers: <meta name="itch:path" content="games/12345" />
-            itch_path = self.get_meta(site, name="itch:path")
+            itch_path = meta_tags.get("itch:path")
             if itch_path is not None:
                 # Its value should be "games/12345", so:
                 game_id = int(itch_path.split("/")[-1])
@@ -102,7 +158,7 @@ class GameDownloader:
 
         if game_id is None:
             # I.ViewGame has the "id" key in its config
-            for script in site.find_all("script", type="text/javascript"):
+            for script in scripts:
                 script_src = script.text.strip()
                 marker = "I.ViewGame"
                 if marker in script_src:
@@ -131,15 +187,20 @@ class GameDownloader:
         if game_id is None:
             raise ItchDownloadError(f"Could not get the Game ID for URL: {url}")
 
+        self.game_id_cache[url] = game_id
         return game_id
 
-    def extract_metadata(self, game_id: int, url: str, site: BeautifulSoup) -> GameMetadata:
-        rating_json: Optional[dict] = self.get_rating_json(site)
+    def extract_metadata(
+        self,
+        game_id: int,
+        url: str,
+        site: BeautifulSoup,
+        meta_tags: Dict[str, str],
+        rating_json: Optional[dict],
+    ) -> GameMetadata:
         title = rating_json.get("name") if rating_json else None
 
-        description: Optional[str] = self.get_meta(site, property="og:description")
-        if not description:
-            description = self.get_meta(site, name="description")
+        description: Optional[str] = meta_tags.get("og:description") or meta_tags.get("description")
 
         screenshot_urls: List[str] = []
         screenshots_node = site.find("div", class_="screenshot_list")
@@ -150,7 +211,7 @@ class GameDownloader:
             game_id=game_id,
             title=title or site.find("h1", class_="game_title").text.strip(),
             url=url,
-            cover_url=self.get_meta(site, property="og:image"),
+            cover_url=meta_tags.get("og:image"),
             screenshots=screenshot_urls,
             description=description,
         )
@@ -189,37 +250,157 @@ class GameDownloader:
         credentials = {}
         if game_id in self.download_keys:
             credentials["download_key_id"] = self.download_keys[game_id]
-            logging.debug("Got credentials for %s: %s", title, str(credentials))
+            logging.debug("Got credentials for %s: %s", title, credentials)
 
         return credentials
 
-    def download_file(self, url: str, download_path: Optional[str], credentials: dict) -> str:
+    def download_file(self, url: str, download_path: Optional[str], credentials: dict) -> Tuple[str, Optional[int]]:
         """Performs a request to download a given file, optionally saves the
-        file to the provided path and returns the final URL that was downloaded."""
+        file to the provided path and returns the final URL that was downloaded
+        plus the number of bytes written (None when nothing was saved)."""
+        downloaded_size: Optional[int] = None
         try:
             # No timeouts, chunked uploads, default retry strategy, should be all good?
             with self.client.get(url, data=credentials, stream=True, guess_encoding=True) as r:
                 r.raise_for_status()
 
                 if download_path is not None:  # ...and it will be for external downloads.
-                    with tqdm.wrapattr(
-                        open(download_path, "wb"),
-                        "write",
-                        miniters=1,
-                        desc=url,
-                        total=int(r.headers.get("content-length", 0)),
-                    ) as f:
-                        for chunk in r.iter_content(chunk_size=1048576):  # 1MB chunks
-                            f.write(chunk)
-
-                return r.url
+                    content_length = int(r.headers.get("content-length", 0))
+
+                    with open(download_path, "wb") as out_file:
+                        if hasattr(os, "posix_fadvise"):
+                            # We only ever stream front-to-back - let the page cache know:
+                            os.posix_fadvise(out_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+                        if content_length > 0 and hasattr(os, "posix_fallocate"):
+                            # Grab the blocks up front instead of regrowing the file per
+                            # write (not all filesystems support this, never mind then):
+                            with contextlib.suppress(OSError):
+                                os.posix_fallocate(out_file.fileno(), 0, content_length)
+
+                        with tqdm.wrapattr(
+                            out_file,
+                            "write",
+                            desc=url,
+                            total=content_length,
+                            mininterval=0.5,
+                            maxinterval=2.0,
+                        ) as f:
+                            downloaded_size = 0
+                            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                                downloaded_size += len(chunk)
+
+                        # In case we preallocated more than the decoded body needed:
+                        out_file.truncate()
+
+                return r.url, downloaded_size
         except HTTPError as e:
             raise ItchDownloadError(f"Unrecoverable download error: {e}") from e
 
-    def download_file_by_upload_id(self, upload_id: int, download_path: Optional[str], credentials: dict) -> str:
+    def download_file_by_upload_id(
+        self,
+        upload_id: int,
+        download_path: Optional[str],
+        credentials: dict,
+    ) -> Tuple[str, Optional[int]]:
         """Performs a request to download a given upload by its ID."""
         return self.download_file(f"/uploads/{upload_id}/download", download_path, credentials)
 
+    def should_skip_file(self, file_name: Optional[str]) -> bool:
+        """Checks an upload's filename against the configured file filters."""
+        if file_name is None:
+            return False  # Let the upload metadata validation complain about this one.
+
+        # The glob filter is normcased like fnmatch.fnmatch would do it;
+        # the regex filter keeps matching the filename as-is:
+        normalized_name = os.path.normcase(file_name)
+
+        if self.filter_files_suffix is not None and not normalized_name.endswith(self.filter_files_suffix):
+            logging.info(
+                "File '%s' does not match the glob filter '%s', skipping",
+                file_name,
+                self.settings.filter_files_glob,
+            )
+            return True
+
+        if self.filter_files_glob and not self.filter_files_glob.match(normalized_name):
+            logging.info(
+                "File '%s' does not match the glob filter '%s', skipping",
+                file_name,
+                self.settings.filter_files_glob,
+            )
+            return True
+
+        if self.filter_files_regex and not self.filter_files_regex.fullmatch(file_name):
+            logging.info(
+                "File '%s' does not match the regex filter '%s', skipping",
+                file_name,
+                self.settings.filter_files_regex,
+            )
+            return True
+
+        return False
+
+    def download_upload(self, upload: dict, files_path: str, credentials: dict) -> Tuple[List[str], List[str]]:
+        """Downloads (or skips) a single game upload into the files directory.
+        Returns the errors and external download URLs it ran into, if any."""
+        if not UPLOAD_REQUIRED_KEYS.issubset(upload):
+            return [f"Upload metadata incomplete: {upload}"], []
+
+        upload_id = upload["id"]
+        file_name = upload["filename"]
+        expected_size = upload.get("size")
+        upload_is_external = upload["storage"] == "external"
+
+        logging.debug(
+            "Downloading '%s' (%d), %s bytes",
+            file_name,
+            upload_id,
+            expected_size if expected_size is not None else "unknown",
+        )
+
+        target_path = None if upload_is_external else os.path.join(files_path, file_name)
+
+        if target_path is not None and expected_size is not None:
+            # Consider a file already downloaded if its size (or the size of its
+            # decompressed contents, see get_decompressed_content_size) matches
+            # what the API expects - saves a full re-download on retried runs.
+            # The contents walk scans the whole archive, so check the cheap
+            # direct size first and only fall back to it on a mismatch.
+            try:
+                already_downloaded = os.stat(target_path).st_size == expected_size
+                if not already_downloaded:
+                    already_downloaded = self.get_decompressed_content_size(target_path) == expected_size
+            except FileNotFoundError:
+                already_downloaded = False
+
+            if already_downloaded:
+                logging.info("File '%s' is already downloaded, skipping", file_name)
+                return [], []
+
+        try:
+            target_url, downloaded_size = self.download_file_by_upload_id(upload_id, target_path, credentials)
+        except ItchDownloadError as e:
+            return [f"Download failed for upload {upload}: {e}"], []
+
+        if upload_is_external:
+            logging.debug("Found external download URL for '%s': %s", file_name, target_url)
+            return [], [target_url]
+
+        if expected_size is not None and downloaded_size != expected_size:
+            # Only pay for the archive-contents scan when the raw size disagrees:
+            content_size = self.get_decompressed_content_size(target_path)
+            if content_size != expected_size:
+                return [
+                    (
+                        f"Downloaded file size is {downloaded_size} (content {content_size}), "
+                        f"expected {expected_size} for upload {upload}"
+                    )
+                ], []
+
+        return [], []
+
     @staticmethod
     def get_decompressed_content_size(target_path: str | os.PathLike[str]) -> None | int:
         """For some files, Itch API returns the decompressed file size, but serves
@@ -249,15 +430,13 @@ class GameDownloader:
         return None
 
     def download(self, url: str, skip_downloaded: bool = True) -> DownloadResult:
-        match = re.match(ITCH_GAME_URL_REGEX, url)
+        match = ITCH_GAME_URL_REGEX.match(url)
         if not match:
             return DownloadResult(url, False, [f"Game URL is invalid: {url} - please file a new issue."], [])
 
         author, game = match["author"], match["game"]
 
         download_path = os.path.join(self.settings.download_to, author, game)
-        os.makedirs(download_path, exist_ok=True)
-
         paths: Dict[str, str] = {k: os.path.join(download_path, v) for k, v in TARGET_PATHS.items()}
 
         if os.path.exists(paths["metadata"]) and skip_downloaded:
@@ -266,17 +445,38 @@ class GameDownloader:
             logging.info("Skipping already-downloaded game for URL: %s", url)
             return DownloadResult(url, True, ["Game already downloaded."], [])
 
+        os.makedirs(download_path, exist_ok=True)
+
+        site_headers = {}
+        if os.path.exists(paths["site"]):
+            # Use the saved page for a conditional fetch - on the usual
+            # 304 we reparse it and skip the full page transfer.
+            site_headers["If-Modified-Since"] = formatdate(os.stat(paths["site"]).st_mtime, usegmt=True)
+
         try:
             logging.info("Downloading %s", url)
-            r = self.client.get(url, append_api_key=False)
+            r = self.client.get(url, append_api_key=False, headers=site_headers)
             r.raise_for_status()
         except Exception as e:
             return DownloadResult(url, False, [f"Could not download the game site for {url}: {e}"], [])
 
-        site = BeautifulSoup(r.text, features="lxml")
+        site_is_fresh = r.status_code != 304
+        if site_is_fresh:
+            site_bytes = r.content
+        else:
+            logging.debug("Reusing already-saved game site for URL: %s", url)
+            with open(paths["site"], "rb") as f:
+                site_bytes = f.read()
+
+        # Itch pages are always UTF-8 - parsing the raw bytes skips a
+        # Python-side decode and matches what we archive to site.html.
+        site = BeautifulSoup(site_bytes, features="lxml", from_encoding="utf-8", parse_only=SITE_PARSE_STRAINER)
+        meta_tags = self.get_meta_tags(site)
+        script_tags = self.get_script_tags(site)
+        rating_json = self.get_rating_json(script_tags.get("application/ld+json", []))
         try:
-            game_id = self.get_game_id(url, site)
-            metadata = self.extract_metadata(game_id, url, site)
+            game_id = self.get_game_id(url, meta_tags, script_tags.get("text/javascript", []))
+            metadata = self.extract_metadata(game_id, url, site, meta_tags, rating_json)
             title = metadata["title"] or game
         except ItchDownloadError as e:
             return DownloadResult(url, False, [str(e)], [])
@@ -289,77 +489,31 @@ class GameDownloader:
             return DownloadResult(url, False, [f"Could not fetch game uploads for {title}: {e}"], [])
 
         game_uploads = game_uploads_req.json()["uploads"]
-        logging.debug("Found %d upload(s): %s", len(game_uploads), str(game_uploads))
+        logging.debug("Found %d upload(s): %s", len(game_uploads), game_uploads)
 
         external_urls = []
         errors = []
 
         try:
-            os.makedirs(paths["files"], exist_ok=True)
-            for upload in game_uploads:
-                if any(key not in upload for key in ("id", "filename", "storage")):
-                    errors.append(f"Upload metadata incomplete: {upload}")
-                    continue
-
-                upload_id = upload["id"]
-                file_name = upload["filename"]
-                expected_size = upload.get("size")
-                upload_is_external = upload["storage"] == "external"
+            # Drop filtered-out uploads before any worker or network effort:
+            game_uploads = [u for u in game_uploads if not self.should_skip_file(u.get("filename"))]
 
-                if self.settings.filter_files_glob and not fnmatch.fnmatch(file_name, self.settings.filter_files_glob):
-                    logging.info(
-                        "File '%s' does not match the glob filter '%s', skipping",
-                        file_name,
-                        self.settings.filter_files_glob,
-                    )
-                    continue
+            os.makedirs(paths["files"], exist_ok=True)
 
-                if self.settings.filter_files_regex and not re.fullmatch(self.settings.filter_files_regex, file_name):
-                    logging.info(
-                        "File '%s' does not match the regex filter '%s', skipping",
-                        file_name,
-                        self.settings.filter_files_regex,
+            if len(game_uploads) > 1:
+                # Uploads of a single game are independent transfers - drive
+                # them through a small pool of their own to overlap the RTTs.
+                workers = min(PER_GAME_DOWNLOAD_WORKERS, len(game_uploads))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(
+                        executor.map(lambda u: self.download_upload(u, paths["files"], credentials), game_uploads)
                     )
-                    continue
+            else:
+                results = [self.download_upload(upload, paths["files"], credentials) for upload in game_uploads]
 
-                logging.debug(
-                    "Downloading '%s' (%d), %s",
-                    file_name,
-                    upload_id,
-                    f"{expected_size} bytes" if expected_size is not None else "unknown size",
-                )
-
-                target_path = None if upload_is_external else os.path.join(paths["files"], file_name)
-
-                try:
-                    target_url = self.download_file_by_upload_id(upload_id, target_path, credentials)
-                except ItchDownloadError as e:
-                    errors.append(f"Download failed for upload {upload}: {e}")
-                    continue
-
-                if upload_is_external:
-                    logging.debug("Found external download URL for %s: %s", title, target_url)
-                    external_urls.append(target_url)
-                    continue
-
-                try:
-                    downloaded_file_stat = os.stat(target_path)
-                except FileNotFoundError:
-                    errors.append(f"Downloaded file not found for upload {upload}")
-                    continue
-
-                downloaded_size = downloaded_file_stat.st_size
-                content_size = self.get_decompressed_content_size(target_path)
-
-                if (
-                    all(x is not None for x in (target_path, expected_size, downloaded_size))
-                    and downloaded_size != expected_size
-                    and content_size != expected_size
-                ):
-                    errors.append(
-                        f"Downloaded file size is {downloaded_size} (content {content_size}), "
-                        f"expected {expected_size} for upload {upload}"
-                    )
+            for upload_errors, upload_external_urls in results:
+                errors += upload_errors
+                external_urls += upload_external_urls
 
             logging.debug("Done downloading files for %s", title)
         except Exception as e:
@@ -372,27 +526,44 @@ class GameDownloader:
             logging.warning("Game %s has external download URLs: %s", title, external_urls)
 
         # TODO: Mirror JS/CSS assets
+        asset_jobs: List[Tuple[str, str]] = []  # (URL, target path)
+
         if self.settings.mirror_web:
             os.makedirs(paths["screenshots"], exist_ok=True)
             for screenshot in metadata["screenshots"]:
                 if not screenshot:
                     continue
 
-                file_name = os.path.basename(screenshot)
-                try:
-                    self.download_file(screenshot, os.path.join(paths["screenshots"], file_name), credentials={})
-                except Exception as e:
-                    errors.append(f"Screenshot download failed (this is not fatal): {e}")
+                target_path = os.path.join(paths["screenshots"], os.path.basename(screenshot))
+                if not os.path.exists(target_path):
+                    asset_jobs.append((screenshot, target_path))
 
         cover_url = metadata.get("cover_url")
         if cover_url:
+            asset_jobs.append((cover_url, paths["cover"] + os.path.splitext(cover_url)[-1]))
+
+        def download_asset(asset_job: Tuple[str, str]) -> Optional[str]:
+            asset_url, asset_path = asset_job
             try:
-                self.download_file(cover_url, paths["cover"] + os.path.splitext(cover_url)[-1], credentials={})
+                self.download_file(asset_url, asset_path, credentials={})
+                return None
             except Exception as e:
-                errors.append(f"Cover art download failed (this is not fatal): {e}")
+                return f"Asset download failed for {asset_url} (this is not fatal): {e}"
+
+        if len(asset_jobs) > 1:
+            # Screenshots and the cover are small and independent - fan them out:
+            with ThreadPoolExecutor(max_workers=min(PER_GAME_DOWNLOAD_WORKERS, len(asset_jobs))) as executor:
+                asset_errors = list(executor.map(download_asset, asset_jobs))
+        else:
+            asset_errors = [download_asset(asset_job) for asset_job in asset_jobs]
+
+        errors.extend(e for e in asset_errors if e)
 
-        with open(paths["site"], "wb") as f:
-            f.write(site.prettify(encoding="utf-8"))
+        if site_is_fresh:
+            # Save the page exactly as served - prettifying the parse tree
+            # costs a full re-serialization and mangles the original markup.
+            with open(paths["site"], "wb") as f:
+                f.write(r.content)
 
         with open(paths["metadata"], "w") as f:
             json.dump(metadata, f, indent=4)
@@ -408,11 +579,13 @@ def drive_downloads(
     jobs: List[str],
     settings: Settings,
     keys: Dict[int, str],
+    client: Optional[ItchApiClient] = None,
 ) -> None:
-    downloader = GameDownloader(settings, keys)
+    downloader = GameDownloader(settings, keys, client=client)
     tqdm_args = {
         "desc": "Games",
         "unit": "game",
+        "mininterval": 1.0,
     }
 
     if settings.parallel > 1:
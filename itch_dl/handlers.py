@@ -2,10 +2,11 @@ import json
 import os.path
 import logging
 import urllib.parse
-from typing import List, Set, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Optional
 
 from http.client import responses
-from bs4 import BeautifulSoup
+from lxml import etree, html
 
 from .api import ItchApiClient
 from .utils import ItchDownloadError, get_int_after_marker_in_json
@@ -13,6 +14,27 @@ from .consts import ITCH_API, ITCH_BASE, ITCH_URL, ITCH_BROWSER_TYPES
 from .config import Settings
 from .keys import get_owned_games
 
+# URL prefixes the main handler cleans up before routing:
+HTTP_PREFIX = "http://"
+HTTPS_PREFIX = "https://"
+ITCH_WWW_PREFIX = f"https://www.{ITCH_BASE}/"
+
+# How many scraping result pages to fetch in parallel per batch:
+PAGE_FETCH_BATCH_SIZE = 8
+
+# Grabs all the <link> targets of <item>s in an RSS feed:
+RSS_ITEM_LINKS_XPATH = etree.XPath("//item/link/text()")
+
+# Grabs the targets of all <a class="game_link"> cells on a profile page:
+PROFILE_GAME_LINKS_XPATH = etree.XPath("//a[contains(concat(' ', normalize-space(@class), ' '), ' game_link ')]/@href")
+
+
+def canonicalize_job_url(url: str) -> str:
+    """Normalizes scraped game URLs so trivial variants of the same page
+    (scheme, hostname casing, trailing slashes) deduplicate to one job."""
+    url_parts = urllib.parse.urlsplit(url.strip())
+    return urllib.parse.urlunsplit(("https", url_parts.netloc.lower(), url_parts.path.rstrip("/"), url_parts.query, ""))
+
 
 def get_jobs_for_game_jam_json(game_jam_json: dict) -> List[str]:
     if "jam_games" not in game_jam_json:
@@ -50,36 +72,49 @@ def get_jobs_for_browse_url(url: str, client: ItchApiClient) -> List[str]:
     the last returned <channel> has no <item> children.
 
     The input URL is cleaned in the main URL handler, so append the
-    .xml?page=N suffix and iterate until we've caught 'em all.
+    .xml?page=N suffix and fetch pages in parallel batches until one
+    of them comes back empty.
     """
-    page = 1
     found_urls: Set[str] = set()
     logging.info("Scraping game URLs from RSS feeds for %s", url)
 
-    while True:
-        logging.info("Downloading page %d (found %d URLs total)", page, len(found_urls))
+    def fetch_page_links(page: int) -> Optional[List[str]]:
+        """Returns the item links on a feed page, or None past the end of the feed."""
         r = client.get(f"{url}.xml?page={page}", append_api_key=False)
         if not r.ok:
-            logging.info("RSS feed returned %s, finished.", r.reason)
-            break
+            logging.info("RSS feed page %d returned %s, finished.", page, r.reason)
+            return None
+
+        if b"<item" not in r.content:
+            # Feeds past the end are just an empty <channel> - don't bother parsing:
+            logging.info("No more items, finished.")
+            return None
 
-        soup = BeautifulSoup(r.text, features="xml")
-        rss_items = soup.find_all("item")
-        if len(rss_items) < 1:
+        feed = etree.fromstring(r.content)
+        item_links = [link.strip() for link in RSS_ITEM_LINKS_XPATH(feed)]
+        if len(item_links) < 1:
             logging.info("No more items, finished.")
-            break
+            return None
+
+        return item_links
+
+    page = 1
+    more_pages = True
+    with ThreadPoolExecutor(max_workers=PAGE_FETCH_BATCH_SIZE) as executor:
+        while more_pages:
+            batch = range(page, page + PAGE_FETCH_BATCH_SIZE)
+            logging.info("Downloading pages %d-%d (found %d URLs total)", batch.start, batch.stop - 1, len(found_urls))
 
-        logging.info("Found %d items.", len(rss_items))
-        for item in rss_items:
-            link_node = item.find("link")
-            if link_node is None:
-                continue
+            for item_links in executor.map(fetch_page_links, batch):
+                if item_links is None:
+                    more_pages = False
+                    break
 
-            node_url = link_node.text.strip()
-            if len(node_url) > 0:
-                found_urls.add(node_url)
+                for node_url in item_links:
+                    if len(node_url) > 0:
+                        found_urls.add(node_url)
 
-        page += 1
+            page += PAGE_FETCH_BATCH_SIZE
 
     if len(found_urls) == 0:
         raise ItchDownloadError("No game URLs found to download.")
@@ -88,29 +123,42 @@ def get_jobs_for_browse_url(url: str, client: ItchApiClient) -> List[str]:
 
 
 def get_jobs_for_collection_json(url: str, client: ItchApiClient) -> List[str]:
-    page = 1
     found_urls: Set[str] = set()
 
-    while True:
-        logging.info("Downloading page %d (found %d URLs total)", page, len(found_urls))
+    def fetch_page(page: int) -> Optional[dict]:
+        """Returns the collection page JSON, or None past the end of the collection."""
         r = client.get(url, data={"page": page}, timeout=15)
         if not r.ok:
             logging.info("Collection page %d returned %d %s, finished.", page, r.status_code, r.reason)
-            break
+            return None
 
         data = r.json()
-
         if len(data["collection_games"]) < 1:
             logging.info("No more items, finished.")
-            break
+            return None
+
+        return data
+
+    page = 1
+    more_pages = True
+    with ThreadPoolExecutor(max_workers=PAGE_FETCH_BATCH_SIZE) as executor:
+        while more_pages:
+            batch = range(page, page + PAGE_FETCH_BATCH_SIZE)
+            logging.info("Downloading pages %d-%d (found %d URLs total)", batch.start, batch.stop - 1, len(found_urls))
+
+            for data in executor.map(fetch_page, batch):
+                if data is None:
+                    more_pages = False
+                    break
 
-        for item in data["collection_games"]:
-            found_urls.add(item["game"]["url"])
+                for item in data["collection_games"]:
+                    found_urls.add(item["game"]["url"])
 
-        if len(data["collection_games"]) == data["per_page"]:
-            page += 1
-        else:
-            break
+                if len(data["collection_games"]) < data["per_page"]:
+                    more_pages = False
+                    break
+
+            page += PAGE_FETCH_BATCH_SIZE
 
     if len(found_urls) == 0:
         raise ItchDownloadError("No game URLs found to download.")
@@ -118,7 +166,15 @@ def get_jobs_for_collection_json(url: str, client: ItchApiClient) -> List[str]:
     return list(found_urls)
 
 
+# Scraped results per creator - lru_cache would key on the (unhashable)
+# client too, so keep a plain dict around instead:
+_creator_games_cache: Dict[str, List[str]] = {}
+
+
 def get_jobs_for_creator(creator: str, client: ItchApiClient) -> List[str]:
+    if creator in _creator_games_cache:
+        return list(_creator_games_cache[creator])
+
     logging.info("Downloading public games for creator %s", creator)
     r = client.get(f"https://{ITCH_BASE}/profile/{creator}", append_api_key=False)
     if not r.ok:
@@ -127,29 +183,26 @@ def get_jobs_for_creator(creator: str, client: ItchApiClient) -> List[str]:
     prefix = f"https://{creator}.{ITCH_BASE}/"
     game_links = set()
 
-    soup = BeautifulSoup(r.text, features="xml")
-    for link in soup.select("a.game_link"):
-        link_url = link.attrs.get("href")
-        if not link_url:
-            continue
-
+    site = html.fromstring(r.content)
+    for link_url in PROFILE_GAME_LINKS_XPATH(site):
         if link_url.startswith(prefix):
             game_links.add(link_url)
 
-    return sorted(game_links)
+    _creator_games_cache[creator] = sorted(game_links)
+    return list(_creator_games_cache[creator])
 
 
 def get_jobs_for_itch_url(url: str, client: ItchApiClient) -> List[str]:
-    if url.startswith("http://"):
+    if url.startswith(HTTP_PREFIX):
         logging.info("HTTP link provided, upgrading to HTTPS")
-        url = "https://" + url[7:]
+        url = HTTPS_PREFIX + url[len(HTTP_PREFIX) :]
 
-    if url.startswith(f"https://www.{ITCH_BASE}/"):
+    if url.startswith(ITCH_WWW_PREFIX):
         logging.info("Correcting www.%s to %s", ITCH_BASE, ITCH_BASE)
-        url = ITCH_URL + "/" + url[20:]
+        url = ITCH_URL + "/" + url[len(ITCH_WWW_PREFIX) :]
 
-    url_parts = urllib.parse.urlparse(url)
-    url_path_parts: List[str] = [x for x in str(url_parts.path).split("/") if len(x) > 0]
+    url_parts = urllib.parse.urlsplit(url)
+    url_path_parts: List[str] = [x for x in url_parts.path.split("/") if x]
 
     if url_parts.netloc == ITCH_BASE:
         if len(url_path_parts) == 0:
@@ -210,18 +263,19 @@ def get_jobs_for_itch_url(url: str, client: ItchApiClient) -> List[str]:
 
 
 def get_jobs_for_path(path: str) -> List[str]:
-    try:  # Game Jam Entries JSON?
-        with open(path, "rb") as f:
-            json_data = json.load(f)
+    with open(path, "rb") as f:
+        file_head = f.read(16).lstrip()
 
-        if not isinstance(json_data, dict):
-            raise ValueError(f"File does not contain a JSON dict: {path}")
+    if file_head.startswith(b"{"):  # Game Jam Entries JSON?
+        try:
+            with open(path, "rb") as f:
+                json_data = json.load(f)
 
-        if "jam_games" in json_data:
-            logging.info("Parsing provided file as a Game Jam Entries JSON...")
-            return get_jobs_for_game_jam_json(json_data)
-    except json.JSONDecodeError:
-        pass  # Not a valid JSON, okay...
+            if "jam_games" in json_data:
+                logging.info("Parsing provided file as a Game Jam Entries JSON...")
+                return get_jobs_for_game_jam_json(json_data)
+        except json.JSONDecodeError:
+            pass  # Not a valid JSON, okay...
 
     url_list = []
     with open(path) as f:  # Plain job list?
@@ -237,16 +291,17 @@ def get_jobs_for_path(path: str) -> List[str]:
     raise ValueError("File format is unknown - cannot read URLs to download.")
 
 
-def get_jobs_for_url_or_path(path_or_url: str, settings: Settings) -> List[str]:
+def get_jobs_for_url_or_path(path_or_url: str, settings: Settings, client: Optional[ItchApiClient] = None) -> List[str]:
     """Returns a list of Game URLs for a given itch.io URL or file."""
     path_or_url = path_or_url.strip()
 
-    if path_or_url.startswith("http://"):
+    if path_or_url.startswith(HTTP_PREFIX):
         logging.info("HTTP link provided, upgrading to HTTPS")
-        path_or_url = "https://" + path_or_url[7:]
+        path_or_url = HTTPS_PREFIX + path_or_url[len(HTTP_PREFIX) :]
 
-    if path_or_url.startswith("https://"):
-        client = ItchApiClient(settings.api_key, settings.user_agent)
+    if path_or_url.startswith(HTTPS_PREFIX):
+        if client is None:
+            client = ItchApiClient(settings.api_key, settings.user_agent, pool_size=PAGE_FETCH_BATCH_SIZE)
         return get_jobs_for_itch_url(path_or_url, client)
     elif os.path.isfile(path_or_url):
         return get_jobs_for_path(path_or_url)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import TypedDict, Dict, List, Any, Tuple, Optional
+from typing import TypedDict, Callable, Dict, List, Any, Tuple, Optional
 
 from bs4 import BeautifulSoup
 
@@ -28,15 +28,39 @@ class InfoboxMetadata(TypedDict, total=False):
     category: Dict[str, str]  # Links
 
 
+# itch.io date blocks always use full English month names:
+MONTH_NUMBERS = {
+    "January": 1,
+    "February": 2,
+    "March": 3,
+    "April": 4,
+    "May": 5,
+    "June": 6,
+    "July": 7,
+    "August": 8,
+    "September": 9,
+    "October": 10,
+    "November": 11,
+    "December": 12,
+}
+
+
 def parse_date_block(td: BeautifulSoup) -> Optional[datetime]:
     abbr = td.find("abbr")
     if not abbr or "title" not in abbr.attrs:
         return None
 
+    # Dates look like "02 March 2023 @ 14:52 UTC" - pick them apart by
+    # hand, strptime drags the locale machinery into every call.
     date_str, time_str = abbr["title"].split("@")
-    date = datetime.strptime(date_str.strip(), "%d %B %Y")
-    time = datetime.strptime(time_str.strip(), "%H:%M UTC")
-    return datetime(date.year, date.month, date.day, time.hour, time.minute)
+    day, month_name, year = date_str.split()
+    try:
+        month = MONTH_NUMBERS[month_name]
+    except KeyError:
+        raise ValueError(f"Unknown month in date block: '{month_name}'") from None
+
+    hour, minute = time_str.strip().removesuffix("UTC").strip().split(":")
+    return datetime(int(year), month, int(day), int(hour), int(minute))
 
 
 def parse_links(td: BeautifulSoup) -> Dict[str, str]:
@@ -46,64 +70,63 @@ def parse_links(td: BeautifulSoup) -> Dict[str, str]:
 
 
 def parse_text_from_links(td: BeautifulSoup) -> List[str]:
-    return list(parse_links(td).keys())
+    return [link.text.strip() for link in td.find_all("a")]
+
+
+def parse_text(td: BeautifulSoup) -> str:
+    return td.text.strip()
+
+
+def parse_first_link_text(td: BeautifulSoup) -> str:
+    return parse_text_from_links(td)[0]
+
+
+def parse_author_block(td: BeautifulSoup) -> Dict[str, str]:
+    author, author_url = parse_links(td).popitem()
+    return {"author": author, "author_url": author_url}
+
+
+# Maps the infobox block name to its InfoboxMetadata key and a parser for
+# the content cell. Adding something new? Extend InfoboxMetadata as well!
+INFOBOX_BLOCK_PARSERS: Dict[str, Tuple[str, Callable[[BeautifulSoup], Any]]] = {
+    "Updated": ("updated_at", parse_date_block),
+    "Release date": ("released_at", parse_date_block),
+    "Published": ("published_at", parse_date_block),
+    "Status": ("status", parse_first_link_text),
+    "Platforms": ("platforms", parse_text_from_links),
+    "Publisher": ("publisher", parse_text),
+    "Author": ("author", parse_author_block),
+    "Authors": ("authors", parse_links),
+    "Genre": ("genre", parse_links),
+    "Made with": ("tools", parse_links),
+    "License": ("license", parse_links),
+    "Code license": ("code_license", parse_links),
+    "Asset license": ("asset_license", parse_links),
+    "Tags": ("tags", parse_links),
+    "Average session": ("length", parse_first_link_text),
+    "Languages": ("languages", parse_links),
+    "Multiplayer": ("multiplayer", parse_links),
+    "Player count": ("player_count", parse_text),
+    "Accessibility": ("accessibility", parse_links),
+    "Inputs": ("inputs", parse_links),
+    "Links": ("links", parse_links),
+    "Mentions": ("mentions", parse_links),
+    "Category": ("category", parse_links),
+}
 
 
 def parse_tr(name: str, content: BeautifulSoup) -> Optional[Tuple[str, Any]]:
-    if name == "Updated":
-        return "updated_at", parse_date_block(content)
-    elif name == "Release date":
-        return "released_at", parse_date_block(content)
-    elif name == "Published":
-        return "published_at", parse_date_block(content)
-    elif name == "Status":
-        return "status", parse_text_from_links(content)[0]
-    elif name == "Platforms":
-        return "platforms", parse_text_from_links(content)
-    elif name == "Publisher":
-        return "publisher", content.text.strip()
-    elif name == "Rating":
+    if name == "Rating":
         return None  # Read the AggregatedRating block instead!
-    elif name == "Author":
-        author, author_url = parse_links(content).popitem()
-        return "author", {"author": author, "author_url": author_url}
-    elif name == "Authors":
-        return "authors", parse_links(content)
-    elif name == "Genre":
-        return "genre", parse_links(content)
-    elif name == "Made with":
-        return "tools", parse_links(content)
-    elif name == "License":
-        return "license", parse_links(content)
-    elif name == "Code license":
-        return "code_license", parse_links(content)
-    elif name == "Asset license":
-        return "asset_license", parse_links(content)
-    elif name == "Tags":
-        return "tags", parse_links(content)
-    elif name == "Average session":
-        return "length", parse_text_from_links(content)[0]
-    elif name == "Languages":
-        return "languages", parse_links(content)
-    elif name == "Multiplayer":
-        return "multiplayer", parse_links(content)
-    elif name == "Player count":
-        return "player_count", content.text.strip()
-    elif name == "Accessibility":
-        return "accessibility", parse_links(content)
-    elif name == "Inputs":
-        return "inputs", parse_links(content)
-    elif name == "Links":
-        return "links", parse_links(content)
-    elif name == "Mentions":
-        return "mentions", parse_links(content)
-    elif name == "Category":
-        return "category", parse_links(content)
-    else:
-        # Oops, you need to extend this with something new. Sorry.
-        # Make sure to add the block name to InfoboxMetadata as well!
+
+    block_parser = INFOBOX_BLOCK_PARSERS.get(name)
+    if block_parser is None:
+        # Oops, you need to extend INFOBOX_BLOCK_PARSERS with something new. Sorry.
         raise NotImplementedError(f"Unknown infobox block name '{name}' - please file a new itch-dl issue.")
 
+    key, parse_block = block_parser
+    return key, parse_block(content)
+
 
 def parse_infobox(infobox: BeautifulSoup) -> InfoboxMetadata:
     """Feed it <div class="game_info_panel_widget">, out goes a dict
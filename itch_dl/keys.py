@@ -1,57 +1,183 @@
+import os
+import json
+import math
+import time
+import hashlib
 import logging
-from typing import Dict, List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from .api import ItchApiClient
+from .config import create_and_get_cache_path
 
-KEYS_CACHED: bool = False
-DOWNLOAD_KEYS: Dict[int, str] = {}
-GAME_URLS: List[str] = []
+# How many key pages to fetch in parallel per batch:
+KEYS_PAGE_BATCH_SIZE = 8
 
+# How long the on-disk owned-keys cache stays valid:
+KEYS_CACHE_TTL_SECONDS = 6 * 60 * 60
 
-def load_keys_and_urls(client: ItchApiClient) -> None:
-    global KEYS_CACHED  # noqa: PLW0603 (whatever, I'll move all this to a class one day)
-    logging.info("Fetching all download keys...")
-    page = 1
 
-    while True:
-        logging.info("Downloading page %d (found %d keys total)", page, len(DOWNLOAD_KEYS))
+class KeyCache:
+    """Lazily fetched cache of all the download keys the configured
+    account owns. Fetching is guarded by a lock, so concurrent callers
+    trigger at most one pass over the owned-keys API."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+
+        # Set this before the first get_* call to skip the disk cache:
+        self.refresh_from_api = False
+
+        self.download_keys: Dict[int, str] = {}
+        self.game_urls: List[str] = []
+
+    def cache_file_path(self, client: ItchApiClient) -> str:
+        # Hash the API key into the name so switching accounts never
+        # serves keys cached for somebody else:
+        key_digest = hashlib.sha256(client.api_key.encode()).hexdigest()[:16]
+        return os.path.join(create_and_get_cache_path(), f"owned-keys-{key_digest}.json")
+
+    def load_from_disk(self, client: ItchApiClient) -> bool:
+        cache_path = self.cache_file_path(client)
+        try:
+            if time.time() - os.stat(cache_path).st_mtime >= KEYS_CACHE_TTL_SECONDS:
+                logging.debug("Download keys cache is stale, refetching: %s", cache_path)
+                return False
+
+            with open(cache_path) as f:
+                data = json.load(f)
+
+            # Parse into locals first - a truncated or hand-edited cache
+            # must not leave half-assigned state behind:
+            download_keys = {int(game_id): key_id for game_id, key_id in data["download_keys"].items()}
+            game_urls = data["game_urls"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logging.debug("Ignoring an unusable download keys cache: %s", cache_path)
+            return False
+
+        self.download_keys = download_keys
+        self.game_urls = game_urls
+        logging.info("Loaded %d download keys from the cache.", len(self.download_keys))
+        return True
+
+    def save_to_disk(self, client: ItchApiClient) -> None:
+        cache_path = self.cache_file_path(client)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+            # Write-and-rename, so a crash never leaves a torn cache around:
+            with open(cache_path + ".tmp", "w") as f:
+                json.dump({"download_keys": self.download_keys, "game_urls": self.game_urls}, f)
+
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError as e:
+            logging.warning("Could not write the download keys cache: %s", e)
+
+    def fetch_page(self, client: ItchApiClient, page: int) -> Optional[dict]:
         r = client.get("/profile/owned-keys", data={"page": page}, timeout=15)
         if not r.ok:
-            break
+            return None
 
         data = r.json()
         if "owned_keys" not in data:
-            break  # Assuming we're out of keys already...
-
-        for key in data["owned_keys"]:
-            DOWNLOAD_KEYS[key["game_id"]] = key["id"]
-            GAME_URLS.append(key["game"]["url"])
-
-        if len(data["owned_keys"]) == data["per_page"]:
-            page += 1
-        else:
-            break
-
-    logging.info("Fetched %d download keys.", len(DOWNLOAD_KEYS))
-    KEYS_CACHED = True
+            return None  # Assuming we're out of keys already...
+
+        return data
+
+    def load(self, client: ItchApiClient) -> bool:
+        """Fetches all the keys from the API. Returns whether that worked -
+        a failed fetch must not look like an account that owns nothing."""
+        logging.info("Fetching all download keys...")
+
+        data = self.fetch_page(client, 1)
+        fetch_ok = data is not None
+        pages = [data] if data else []
+
+        if data and "total" in data and len(data["owned_keys"]) == data["per_page"]:
+            # We know how many pages are left - grab them all at once:
+            total_pages = math.ceil(data["total"] / data["per_page"])
+            logging.info("Downloading %d key pages...", total_pages)
+            with ThreadPoolExecutor(max_workers=KEYS_PAGE_BATCH_SIZE) as executor:
+                fetched = list(executor.map(lambda n: self.fetch_page(client, n), range(2, total_pages + 1)))
+
+            # A page failing mid-set leaves us with an incomplete key list -
+            # usable for this run, but it must not end up in the snapshot:
+            fetch_ok = None not in fetched
+            pages += [p for p in fetched if p]
+        elif data:
+            # No total count available - fetch page batches until one comes up short:
+            page = 2
+            more_pages = len(data["owned_keys"]) == data["per_page"]
+            with ThreadPoolExecutor(max_workers=KEYS_PAGE_BATCH_SIZE) as executor:
+                while more_pages:
+                    batch = range(page, page + KEYS_PAGE_BATCH_SIZE)
+                    logging.info("Downloading key pages %d-%d...", batch.start, batch.stop - 1)
+
+                    for data in executor.map(lambda n: self.fetch_page(client, n), batch):
+                        if data is None:
+                            # Failed mid-walk, not the end of the data - the
+                            # incomplete result must not get snapshotted:
+                            fetch_ok = False
+                            more_pages = False
+                            break
+
+                        if len(data["owned_keys"]) == 0:
+                            more_pages = False
+                            break
+
+                        pages.append(data)
+                        if len(data["owned_keys"]) < data["per_page"]:
+                            more_pages = False
+                            break
+
+                    page += KEYS_PAGE_BATCH_SIZE
+
+        for data in pages:
+            for key in data["owned_keys"]:
+                self.download_keys[key["game_id"]] = key["id"]
+                self.game_urls.append(key["game"]["url"])
+
+        logging.info("Fetched %d download keys.", len(self.download_keys))
+        return fetch_ok
+
+    def _ensure_loaded(self, client: ItchApiClient) -> None:
+        with self._lock:
+            if not self._loaded:
+                loaded_from_disk = not self.refresh_from_api and self.load_from_disk(client)
+
+                # Only cache actual results - persisting a failed fetch
+                # would serve "no keys owned" until the TTL runs out:
+                if not loaded_from_disk and self.load(client):
+                    self.save_to_disk(client)
+
+                self._loaded = True
+
+    def get_owned_keys(self, client: ItchApiClient) -> Tuple[Dict[int, str], List[str]]:
+        self._ensure_loaded(client)
+        return self.download_keys, self.game_urls
+
+    def get_download_keys(self, client: ItchApiClient) -> Dict[int, str]:
+        self._ensure_loaded(client)
+        return self.download_keys
+
+    def get_owned_games(self, client: ItchApiClient) -> List[str]:
+        self._ensure_loaded(client)
+        return self.game_urls
+
+
+# Shared process-wide cache - itch-dl downloads for one account per run:
+KEY_CACHE = KeyCache()
 
 
 def get_owned_keys(client: ItchApiClient) -> Tuple[Dict[int, str], List[str]]:
-    if not KEYS_CACHED:
-        load_keys_and_urls(client)
-
-    return DOWNLOAD_KEYS, GAME_URLS
+    return KEY_CACHE.get_owned_keys(client)
 
 
 def get_download_keys(client: ItchApiClient) -> Dict[int, str]:
-    if not KEYS_CACHED:
-        load_keys_and_urls(client)
-
-    return DOWNLOAD_KEYS
+    return KEY_CACHE.get_download_keys(client)
 
 
 def get_owned_games(client: ItchApiClient) -> List[str]:
-    if not KEYS_CACHED:
-        load_keys_and_urls(client)
-
-    return GAME_URLS
+    return KEY_CACHE.get_owned_games(client)
@@ -1,4 +1,3 @@
-import re
 from typing import Optional
 
 
@@ -6,6 +5,41 @@ class ItchDownloadError(Exception):
     pass
 
 
+def _scan_int_after_key(marker_line: str, key: str) -> Optional[int]:
+    """Scans for '"key":<optional whitespace><digits>' and returns the int,
+    or None when the key is missing or appears more than once. Equivalent
+    to the '\\"key\\":\\s?(\\d+)' regex this used to run, minus the regex."""
+    needle = f'"{key}":'
+    line_length = len(marker_line)
+    found: Optional[int] = None
+
+    search_from = 0
+    while True:
+        needle_index = marker_line.find(needle, search_from)
+        if needle_index == -1:
+            break
+
+        search_from = needle_index + len(needle)
+
+        digits_start = search_from
+        if digits_start < line_length and marker_line[digits_start].isspace():
+            digits_start += 1
+
+        digits_end = digits_start
+        while digits_end < line_length and "0" <= marker_line[digits_end] <= "9":
+            digits_end += 1
+
+        if digits_end == digits_start:
+            continue  # The key holds something other than a number.
+
+        if found is not None:
+            return None  # Multiple matches - ambiguous, just like before.
+
+        found = int(marker_line[digits_start:digits_end])
+
+    return found
+
+
 def get_int_after_marker_in_json(text: str, marker: str, key: str) -> Optional[int]:
     """
     Many itch.io sites use a pattern like this: Most of the HTML page
@@ -14,21 +48,11 @@ def get_int_after_marker_in_json(text: str, marker: str, key: str) -> Optional[i
     somewhere near the end of each page. Those config blocks often
     contain metadata like game/page IDs that we want to extract.
     """
-    marker_line: Optional[str] = None
-    for line in reversed(text.splitlines()):
-        marker_index = line.find(marker)
-        if marker_index != -1:
-            marker_line = line[marker_index:]
-            break
-
-    if marker_line is None:
+    marker_index = text.rfind(marker)
+    if marker_index == -1:
         return None
 
-    # Notice double-slashes in the f-string (not r-string)!
-    pattern = f'\\"{key}\\":\\s?(\\d+)'
-
-    found_ints = re.findall(pattern, marker_line)
-    if len(found_ints) != 1:
-        return None
+    line_end = text.find("\n", marker_index)
+    marker_line = text[marker_index:] if line_end == -1 else text[marker_index:line_end]
 
-    return int(found_ints[0])
+    return _scan_int_after_key(marker_line, key)